@@ -14,15 +14,26 @@
 # API documentation: https://www.tredict.com/blog/oauth_docs/
 
 import os
+import io
 import requests
-import uuid
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import time
+import copy
+import threading
 from datetime import datetime, timezone
-from typing import Self
-
-import http.server
-from socketserver import TCPServer
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from itertools import islice
+from functools import cache
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import Iterator, Self
+
+try:
+    import orjson
+except ImportError:  # Optional, fall back to the standard library
+    orjson = None
 
 AUTH_URL = "https://www.tredict.com/authorization/"
 TOKEN_URL = "https://www.tredict.com/user/oauth/v2/token/"
@@ -37,8 +48,49 @@ ERROR_CODES = {
     500: "Something went wrong on our side",
     503: "Sorry, we went to the pub",
 }
+# Sent with JSON request bodies, other default headers are set on the session
+JSON_HEADERS = {"content-type": "application/json;charset=UTF-8"}
+ENDPOINTS = (
+    "activityList",
+    "plannedTrainingList",
+    "activity",
+    "bodyvalues",
+    "capacity",
+    "zones",
+    "efforts",
+    "hrv",
+    "activity/file",
+    "plannedTraining/file",
+    "activity/upload",
+)
+SPORT_TYPES = frozenset({"running", "cycling", "swimming", "misc"})
+LANGUAGES = frozenset({"en", "de"})
+FILE_TYPES = frozenset({"json", "fit"})
+MANDATORY_FIELDS = frozenset(
+    {"auth_code", "user_access_token", "personal_access_token"}
+)
 AUTH_CODE_EXPIRES_IN = 600
+AUTH_TIMEOUT = 300  # Seconds to wait for the authorisation callback
 RENEWAL_BUFFER = 60
+MAX_WORKERS = 8
+CHUNK_SIZE = 64 * 1024
+
+# Connect and read timeouts in seconds so a stalled request cannot hold a connection forever
+TIMEOUT = (5, 30)
+
+# Retry requests which failed due to rate limiting or a temporary server error, POST is left out as uploads may not
+# be safe to repeat
+RETRY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET", "DELETE"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# Parsed config files keyed by absolute path with the modification time and size they were parsed at
+_CONFIG_CACHE: dict[str, tuple[tuple[int, int], dict]] = {}
 
 
 class APIException(Exception):
@@ -51,9 +103,154 @@ class APIException(Exception):
     pass
 
 
+class _MultipartBody:
+    """A multipart/form-data request body which reads the file as it is sent.
+
+    Args:
+        file (tuple): Field name, file name and the open file.
+        fields (dict): Text fields to include after the file. Fields with a value of None are left out.
+    """
+
+    def __init__(self, file: tuple, fields: dict):
+        boundary = os.urandom(16).hex()
+        name, file_name, f = file
+
+        head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{_MultipartBody._escape(name)}"; '
+            f'filename="{_MultipartBody._escape(file_name)}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode("utf-8")
+        tail = "".join(
+            f"\r\n--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{_MultipartBody._escape(k)}"\r\n\r\n{v}'
+            for k, v in fields.items()
+            if v is not None
+        )
+        tail = f"{tail}\r\n--{boundary}--\r\n".encode("utf-8")
+
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self._parts = [io.BytesIO(head), f, io.BytesIO(tail)]
+        self._length = len(head) + os.fstat(f.fileno()).st_size - f.tell() + len(tail)
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        """Percent encode the characters which could break out of a quoted header value or add header lines.
+
+        Args:
+            value (str): Value to escape.
+
+        Returns:
+            str: The escaped value.
+        """
+        return str(value).replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        """Read the next part of the body.
+
+        Args:
+            size (int, optional): Maximum number of bytes to read or all if negative or None. Defaults to -1.
+
+        Returns:
+            bytes: The next part of the body or empty when it has all been read.
+        """
+        if size is None:
+            size = -1
+
+        chunks = []
+
+        while self._parts and size != 0:
+            chunk = self._parts[0].read(size)
+            if chunk:
+                chunks.append(chunk)
+                size = size - len(chunk) if size > 0 else size
+            else:  # Move on to the next part
+                self._parts.pop(0)
+
+        return b"".join(chunks)
+
+
+@cache
+def _callback_handler() -> type:
+    """Create the request handler for the authorisation callback server.
+
+    The class is only created when first needed so http.server is not imported unless authorising. The server it is
+    used with must have params and done attributes for it to set when the callback arrives.
+
+    Returns:
+        type: The request handler class.
+    """
+
+    import http.server
+
+    class CallbackHandler(http.server.BaseHTTPRequestHandler):
+
+        # Respond as HTTP/1.1 as browsers expect, which allows keep-alive so respond() closes each connection
+        protocol_version = "HTTP/1.1"
+
+        # Other pages a browser may request and their responses
+        routes = {
+            "/favicon.ico": (404, "Not Found"),  # Add favicon at some point
+            "/privacy": (204, "No Content"),  # Will add a privacy policy
+        }
+
+        def respond(self, code: int, message: str, body: bytes = b""):
+            self.send_response(code, message)
+            # Close the connection so the browser cannot hold the server open with keep-alive
+            self.send_header("Connection", "close")
+            if body:
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Browsers make several requests, do not log each of them
+
+        def do_GET(self):
+            path = urlsplit(self.path).path
+
+            if path in self.routes:
+                self.respond(*self.routes[path])
+                return
+
+            # Create a dict of the params, should be code and state or error
+            query = TredictPy._params_from_path(self.path)
+
+            if path == "/" and "code" in query:  # Successful callback
+                self.server.params = query
+                self.respond(200, "Ok", b"Authorisation complete!")
+                self.server.done.set()
+            elif path == "/" and "error" in query:  # Error callback
+                self.server.params = query
+                self.respond(200, "Ok", b"Authorisation failed!")
+                self.server.done.set()
+            else:  # A page that does not exist was requested
+                self.respond(404, "Not Found")
+
+    return CallbackHandler
+
+
 class TredictPy:
     """A straightforward script to authorise, authenticate and interact with Tredict."""
 
+    __slots__ = (
+        "_client_id",
+        "_client_secret",
+        "_token_append",
+        "_endpoint_append",
+        "_config_file",
+        "_with_personal_access_token",
+        "_config",
+        "_session",
+        "_refresh_lock",
+        "_token_url",
+        "_endpoint_urls",
+        "_expires_mono",
+    )
+
     def __init__(
         self,
         client_id: str = None,
@@ -84,6 +281,27 @@ class TredictPy:
         self._endpoint_append = endpoint_append
         self._config_file = config_file
         self._with_personal_access_token = with_personal_access_token
+
+        # The append strings are fixed so build the token and endpoint URLs once
+        self._token_url = f"{TOKEN_URL}{token_append}"
+        endpoint_suffix = f"/{endpoint_append}" if endpoint_append else ""
+        self._endpoint_urls = {
+            endpoint: f"{ENDPOINT_BASE_URL}{endpoint}{endpoint_suffix}"
+            for endpoint in ENDPOINTS
+        }
+
+        # Keep connections alive across requests and pages rather than a new handshake each time
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=MAX_WORKERS, max_retries=RETRY
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update({"accept": "application/json;charset=UTF-8"})
+        self._refresh_lock = threading.Lock()
+        # Expiry of a user access token obtained by this client on the monotonic clock
+        self._expires_mono = None
+
         self._load_config()
 
     @classmethod
@@ -126,6 +344,19 @@ class TredictPy:
             client_id, client_secret, token_append, endpoint_append, config_file, False
         )
 
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connections held open to Tredict.
+
+        Called automatically when used as a context manager.
+        """
+        self._session.close()
+
     def _load_config(self) -> None:
         """Load the config from file.
 
@@ -133,8 +364,17 @@ class TredictPy:
             APIException: If the config does not contain all mandatory fields.
         """
         if os.path.isfile(self._config_file):
-            with open(self._config_file, "rt") as f:
-                self._config = json.load(f)
+            path = os.path.abspath(self._config_file)
+            st = os.stat(path)
+            stamp = (st.st_mtime_ns, st.st_size)
+
+            # Only parse the file again if it has changed since it was last loaded or saved
+            if path in _CONFIG_CACHE and _CONFIG_CACHE[path][0] == stamp:
+                self._config = copy.deepcopy(_CONFIG_CACHE[path][1])
+            else:
+                with open(self._config_file, "rb") as f:
+                    self._config = TredictPy._json_loads(f.read())
+                _CONFIG_CACHE[path] = (stamp, copy.deepcopy(self._config))
         else:
             self._config = {
                 "auth_code": None,
@@ -142,96 +382,150 @@ class TredictPy:
                 "personal_access_token": None,
             }
 
-        if not set(
-            [
-                "auth_code",
-                "user_access_token",
-                "personal_access_token",
-            ]
-        ).issubset(self._config.keys()):
+        if not MANDATORY_FIELDS.issubset(self._config):
             self._config_file = None
             self._config = None
             raise APIException("Config does not contain mandatory fields.")
 
-    def _save_config(self, d: dict = None) -> None:
+        self._update_authorization()
+
+    def _save_config(self, d: dict = None, pretty: bool = False) -> None:
         """Save and optionally update the config to file.
 
         Args:
             d (dict, optional): Dict to add to the config. Defaults to None.
+            pretty (bool, optional): Indent the config for editing by hand. Defaults to False.
         """
         if d is not None:
+            # Nothing has changed so the file is already up to date unless it is to be reformatted
+            if (
+                not pretty
+                and os.path.isfile(self._config_file)
+                and all(
+                    k in self._config and self._config[k] == v for k, v in d.items()
+                )
+            ):
+                return
+
             self._config.update(d)
-        with open(self._config_file, "wt") as f:
-            f.write(json.dumps(self._config, indent=4))
 
-    @staticmethod
-    def _params_from_path(path: str) -> dict:
-        """Split a query string from a URL path and create a dict of the key and value parameter pairs.
+        # Write to a temporary file and replace so a failed write cannot leave a corrupt config
+        tmp_file = f"{self._config_file}.tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(TredictPy._json_dumps(self._config, pretty) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+            st = os.fstat(f.fileno())
+        os.replace(tmp_file, self._config_file)
+
+        # What was written is already known so the next load does not need to parse it
+        _CONFIG_CACHE[os.path.abspath(self._config_file)] = (
+            (st.st_mtime_ns, st.st_size),
+            copy.deepcopy(self._config),
+        )
 
-        Args:
-            path (str): URL path.
+        self._update_authorization()
 
-        Returns:
-            dict: Dict of the key and value parameter pairs.
+    def _update_authorization(self) -> None:
+        """Set the authorization header used by the session from the config.
+
+        The personal access token is preferred over the user access token. Called whenever the config is loaded or
+        saved so the header is built once per token rather than on every request.
         """
-        return dict(
-            [tuple(p.split("=")) for p in path[(path.index("?") + 1) :].split("&")]
+        bearer_token = self._config["personal_access_token"] or (
+            self._config["user_access_token"]["access_token"]
+            if self._config["user_access_token"]
+            else None
         )
 
-    def _callback_server(self) -> dict:
-        """Run a callback server to wait for the API authorisation response.
+        if bearer_token:
+            self._session.headers["authorization"] = f"bearer {bearer_token}"
+        else:
+            self._session.headers.pop("authorization", None)
+
+    @staticmethod
+    def _json_loads(data: bytes) -> dict:
+        """Parse JSON using orjson if it is installed or the standard library if not.
+
+        Args:
+            data (bytes): JSON to parse.
 
         Returns:
-            dict: Response parameters.
+            dict: The parsed JSON.
         """
+        return orjson.loads(data) if orjson else json.loads(data)
 
-        done = False
-        params = None
-
-        class Handler(http.server.BaseHTTPRequestHandler):
+    @staticmethod
+    def _json_dumps(obj: dict, pretty: bool = False) -> bytes:
+        """Serialise to JSON using orjson if it is installed or the standard library if not.
 
-            def do_GET(self):
-                nonlocal done, params
+        Args:
+            obj (dict): Object to serialise.
+            pretty (bool, optional): Indent the JSON. Defaults to False.
 
-                if self.path.startswith("/?code="):  # Successful callback
+        Returns:
+            bytes: The JSON.
+        """
+        if orjson:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+        else:
+            return json.dumps(
+                obj,
+                indent=2 if pretty else None,
+                separators=None if pretty else (",", ":"),
+            ).encode("utf-8")
 
-                    self.send_response(200, "Ok")
-                    self.end_headers()
+    @staticmethod
+    def _params_from_path(path: str) -> dict:
+        """Split a query string from a URL path and create a dict of the decoded key and value parameter pairs.
 
-                    # Create a dict of the params, should be code and state
-                    params = TredictPy._params_from_path(self.path)
+        Args:
+            path (str): URL path.
 
-                    self.wfile.write("Authorisation complete!".encode("utf-8"))
-                    done = True
+        Returns:
+            dict: Dict of the key and value parameter pairs.
+        """
+        return dict(parse_qsl(urlsplit(path).query, keep_blank_values=True))
 
-                elif self.path.startswith("/?error="):  # Error callback
+    def _callback_server(self) -> dict:
+        """Run a callback server to wait for the API authorisation response.
 
-                    self.send_response(200, "Ok")
-                    self.end_headers()
+        Raises:
+            APIException: If no response is received within the timeout.
 
-                    # Create a dict of the params, should be code and state
-                    params = TredictPy._params_from_path(self.path)
+        Returns:
+            dict: Response parameters.
+        """
 
-                    self.wfile.write("Authorisation failed!".encode("utf-8"))
-                    done = True
+        # Only needed for authorisation so not imported unless used
+        import http.server
 
-                elif self.path.startswith("/favicon.ico"):  # Add favicon at some point
-                    self.send_response(404, "Not Found")
-                    self.end_headers()
-                elif self.path.startswith("/privacy"):  # Will add a privacy policy
-                    self.send_response(204, "No Content")
-                    self.end_headers()
-                else:  # A page that does not exist was requested
-                    self.send_response(404, "Not Found")
-                    self.end_headers()
+        # Serve in the background and wait to be woken by the callback rather than looping over requests
+        with http.server.ThreadingHTTPServer(
+            ("localhost", 8080), _callback_handler()
+        ) as httpd:
+            # Shared with the handler which sets them when the callback arrives
+            httpd.params = None
+            httpd.done = threading.Event()
 
-        with TCPServer(("localhost", 8080), Handler) as httpd:
             print("Callback server started...")
-            while not done:
-                httpd.handle_request()
-            print("Callback server stopped.")
+            server_thread = threading.Thread(
+                target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+            )
+            server_thread.start()
+            try:
+                received = httpd.done.wait(AUTH_TIMEOUT)
+            finally:
+                httpd.shutdown()
+                server_thread.join()
+                print("Callback server stopped.")
+
+        if not received:
+            raise APIException(
+                f"Authorisation timed out after {AUTH_TIMEOUT} seconds waiting for the callback."
+            )
 
-        return params
+        return httpd.params
 
     def _callback_headless(self) -> dict:
         """Prompt the user for the API authorisation response URL.
@@ -284,16 +578,89 @@ class TredictPy:
                 "Cannot check validity when using a personal access token."
             )
 
-        # An access token was obtained before but it has expired
+        # An access token was obtained before but it has expired or is about to
         # can refresh using the refresh token
-        if (
-            self._config["user_access_token"]
-            and self._config["user_access_token"]["expires_on"]
-            > int(time.time()) - RENEWAL_BUFFER
-        ):
-            return True
-        else:
+        if not self._config["user_access_token"]:
             return False
+        elif self._expires_mono is not None:
+            # Obtained by this client so not affected by changes to the system clock
+            return self._expires_mono > time.monotonic() + RENEWAL_BUFFER
+        else:
+            return (
+                self._config["user_access_token"]["expires_on"]
+                > int(time.time()) + RENEWAL_BUFFER
+            )
+
+    def _ensure_valid_token(self) -> None:
+        """Make sure there is a valid token to make a request with.
+
+        Refreshes the user access token if it has expired or is about to. Only one thread refreshes at a time, any
+        others waiting on the lock use the refreshed token.
+
+        Raises:
+            APIException: If there is no personal access token and the user access token was not obtained or could
+            not be refreshed.
+        """
+
+        if self._config["personal_access_token"]:
+            return
+
+        if self._with_personal_access_token or not self._config["user_access_token"]:
+            raise APIException(
+                "No personal access token and user access token not obtained or expired."
+            )
+
+        if not self.is_user_access_token_valid():
+            with self._refresh_lock:
+                # Check again as another thread may have refreshed while waiting
+                if not self.is_user_access_token_valid():
+                    self.request_user_access_token(refresh=True)
+
+    def _get(
+        self, url: str, action: str, params: dict = None, stream: bool = False
+    ) -> requests.Response:
+        """Make a GET request.
+
+        If the user access token is rejected it is refreshed and the request is retried once.
+
+        Args:
+            url (str): URL to request.
+            action (str): What is being requested, the start of the error message if the request fails.
+            params (dict, optional): Parameters if required for the request. Defaults to None.
+            stream (bool, optional): Do not download the response content immediately. Defaults to False.
+
+        Raises:
+            APIException: If the request fails.
+
+        Returns:
+            requests.Response: The successful response.
+        """
+
+        authorization = self._session.headers.get("authorization")
+
+        r = self._session.get(
+            url,
+            params=params,
+            stream=stream,
+            timeout=TIMEOUT,
+        )
+
+        if r.status_code == 401 and not self._config["personal_access_token"]:
+            r.close()
+
+            with self._refresh_lock:
+                # Only refresh if another thread has not already done so
+                if self._session.headers.get("authorization") == authorization:
+                    self.request_user_access_token(refresh=True)
+
+            r = self._session.get(
+                url,
+                params=params,
+                stream=stream,
+                timeout=TIMEOUT,
+            )
+
+        return TredictPy._check_response(action, r)
 
     def request_auth_code(self, headless: bool = False) -> None:
         """Request an authorisation code.
@@ -305,8 +672,8 @@ class TredictPy:
             headless (bool, optional): Run in headless mode. Defaults to False.
 
         Raises:
-            APIException: If the returned and supplied sates do not match or the authorisation failed or a personal
-            access token is being used.
+            APIException: If the returned and supplied sates do not match or the authorisation failed or timed out or a
+            personal access token is being used.
         """
 
         if self._with_personal_access_token:
@@ -314,6 +681,8 @@ class TredictPy:
                 "Cannot request a authorisation code when using a personal access token."
             )
 
+        import uuid  # Only needed for authorisation so not imported unless used
+
         user_uuid = str(uuid.uuid4())
 
         print(
@@ -323,7 +692,7 @@ class TredictPy:
         # Start the callback server or go headless
         params = self._callback_headless() if headless else self._callback_server()
 
-        if "code" in params.keys() and params["state"] == user_uuid:
+        if "code" in params and params["state"] == user_uuid:
             print("Authorisation complete!")
             self._save_config(
                 {
@@ -331,7 +700,7 @@ class TredictPy:
                     | {"expires_on": int(time.time() + AUTH_CODE_EXPIRES_IN)}
                 }
             )
-        elif "code" in params.keys() and params["state"] != user_uuid:
+        elif "code" in params and params["state"] != user_uuid:
             raise APIException(
                 f"Authorisation failed! Returned state does not match supplied state."
             )
@@ -357,7 +726,7 @@ class TredictPy:
             )
 
         if not refresh and (
-            self._config["auth_code"] is None or "auth_code" not in self._config.keys()
+            self._config["auth_code"] is None or "auth_code" not in self._config
         ):
             raise APIException("You must request an authorisation code first.")
 
@@ -371,45 +740,43 @@ class TredictPy:
                 "You must request a user access token with an authorisation code before you can refresh."
             )
 
-        headers = {
-            "content-type": "application/x-www-form-urlencoded",
-            "accept": "application/json;charset=UTF-8",
-        }
+        if refresh:
+            data = {
+                "grant_type": "refresh_token",
+                "refresh_token": self._config["user_access_token"]["refresh_token"],
+            }
+        else:
+            data = {
+                "grant_type": "authorization_code",
+                "code": self._config["auth_code"]["code"],
+            }
 
-        data = {
-            "grant_type": "refresh_token" if refresh else "authorization_code",
-            "code": None if refresh else self._config["auth_code"]["code"],
-            "refresh_token": (
-                self._config["user_access_token"]["refresh_token"] if refresh else None
+        r = TredictPy._check_response(
+            "Retrieving user access token",
+            self._session.post(
+                self._token_url,
+                auth=(self._client_id, self._client_secret),
+                data=data,
+                timeout=TIMEOUT,
             ),
-        }
-
-        r = requests.post(
-            f"{TOKEN_URL}{self._token_append}",
-            headers=headers,
-            auth=(self._client_id, self._client_secret),
-            data=data,
         )
 
-        if r.status_code == 200:
-            print("User access token successfully retrieved!")
-
-            user_access_token = {
-                "user_access_token": r.json()
-                | {"expires_on": int(time.time() + r.json()["expires_in"])}
-            }
+        print("User access token successfully retrieved!")
 
-            if refresh:
-                user_access_token["user_access_token"].update(
-                    {"refresh_token": data["refresh_token"]}
-                )
+        token = TredictPy._json_loads(r.content)
+        self._expires_mono = time.monotonic() + token["expires_in"]
+        user_access_token = {
+            "user_access_token": token
+            | {"expires_on": int(time.time() + token["expires_in"])}
+        }
 
-            self._save_config(user_access_token)
-        else:
-            raise APIException(
-                f"Retrieving user access token failed error {r.status_code} ({ERROR_CODES[r.status_code]})."
+        if refresh:
+            user_access_token["user_access_token"].update(
+                {"refresh_token": data["refresh_token"]}
             )
 
+        self._save_config(user_access_token)
+
     def deregister(self) -> None:
         """Deregister from the API.
 
@@ -427,23 +794,108 @@ class TredictPy:
             "authorization": f"bearer {self._config['user_access_token']['access_token']}",
         }
 
-        r = requests.delete(
-            f"{TOKEN_URL}{self._token_append}",
-            headers=headers,
+        TredictPy._check_response(
+            "Deregistering",
+            self._session.delete(
+                self._token_url,
+                headers=headers,
+                timeout=TIMEOUT,
+            ),
         )
 
+        print("Successfully deregistered!")
+        self._expires_mono = None
+        self._save_config({"user_access_token": None, "auth_code": None})
+
+    @staticmethod
+    def _page_urls(links: dict) -> list:
+        """Build the URLs of all remaining pages from the links of a list response.
+
+        Only possible when there is a last link and the next and last links carry a page number. Otherwise the pages
+        must be walked by following the next links.
+
+        Args:
+            links (dict): Links of the list response.
+
+        Returns:
+            list: URLs of the remaining pages or None if they cannot be built.
+        """
+        if "last" not in links:
+            return None
+
+        next_url = urlsplit(links["next"]["href"])
+        next_query = dict(parse_qsl(next_url.query, keep_blank_values=True))
+        last_query = dict(parse_qsl(urlsplit(links["last"]["href"]).query))
+
+        if "page" not in next_query or "page" not in last_query:
+            return None
+
+        return [
+            urlunsplit(next_url._replace(query=urlencode(next_query | {"page": page})))
+            for page in range(int(next_query["page"]), int(last_query["page"]) + 1)
+        ]
+
+    @staticmethod
+    def _check_response(action: str, r: requests.Response) -> requests.Response:
+        """Check a response was successful.
+
+        Tredict responds with 200 on success. Other 2xx statuses such as 204 have no body to decode so they are treated
+        as failures rather than passed on to be parsed.
+
+        Args:
+            action (str): What was requested, the start of the error message if the request failed.
+            r (requests.Response): The response to check.
+
+        Raises:
+            APIException: If the request failed.
+
+        Returns:
+            requests.Response: The response if it was successful.
+        """
         if r.status_code == 200:
-            print("Successfully deregistered!")
-            self._save_config({"user_access_token": None, "auth_code": None})
+            return r
+
+        r.close()  # Release the connection if the response was streamed
+        raise APIException(
+            f"{action} failed error {r.status_code} ({ERROR_CODES.get(r.status_code, 'Unknown error')})."
+        )
+
+    @staticmethod
+    def _without_none(d: dict) -> dict:
+        """Drop the items which have a value of None, for parameters which were not supplied.
+
+        Args:
+            d (dict): Dict to filter.
+
+        Returns:
+            dict: A new dict without the items with a value of None.
+        """
+        return {k: v for k, v in d.items() if v is not None}
+
+    @staticmethod
+    def _iso_utc(dt: datetime | str) -> str:
+        """Format a datetime as ISO 8601 in UTC.
+
+        Skips the conversion when the datetime is already in UTC. Strings are assumed to be formatted already so
+        callers can format a date once and reuse it across many calls.
+
+        Args:
+            dt (datetime | str): Datetime to format. Local times will be converted to UTC.
+
+        Returns:
+            str: The formatted datetime or None if dt is None.
+        """
+        if dt is None or isinstance(dt, str):
+            return dt
+        elif dt.tzinfo is timezone.utc:
+            return dt.isoformat()
         else:
-            raise APIException(
-                f"Deregistering failed error {r.status_code} ({ERROR_CODES[r.status_code]})."
-            )
+            return dt.astimezone(timezone.utc).isoformat()
 
-    def _list_endpoint(self, endpoint: str, params: dict) -> list:
-        """Make a request to a list endpoint.
+    def _iter_list_endpoint(self, endpoint: str, params: dict) -> Iterator[dict]:
+        """Make a request to a list endpoint and yield the items as each page arrives.
 
-        Handles pagination.
+        Handles pagination. Pages are fetched concurrently when the number of pages is known.
 
         Args:
             endpoint (str): Name of the list endpoint.
@@ -452,70 +904,71 @@ class TredictPy:
         Raises:
             APIException: If the request fails.
 
-        Returns:
-            list: A list of the response pages.
+        Yields:
+            dict: The items from each of the response pages in order.
         """
 
-        if (
-            not self._config["personal_access_token"]
-            and not self.is_user_access_token_valid()
-        ):
-            raise APIException(
-                "No personal access token and user access token not obtained or expired."
+        self._ensure_valid_token()
+
+        def get_page(url: str, params: dict = None) -> tuple:
+            body = TredictPy._json_loads(
+                self._get(url, f"Request to {endpoint}", params).content
             )
+            # The embedded list is the only item in _embedded, which may be empty or left out when there are no results
+            embedded = body.get("_embedded", {})
+            return body.get("_links", {}), next(iter(embedded.values()), [])
 
-        bearer_token = (
-            self._config["personal_access_token"]
-            or self._config["user_access_token"]["access_token"]
-        )
+        url = self._endpoint_urls[endpoint]
 
-        headers = {
-            "authorization": f"bearer {bearer_token}",
-            "accept": "application/json;charset=UTF-8",
-        }
+        while True:
 
-        pages = []
-        url = (
-            ENDPOINT_BASE_URL
-            + endpoint
-            + ("/" + self._endpoint_append if self._endpoint_append else "")
-        )
+            links, items = get_page(url, params)
+            yield from items
 
-        while True:
+            if "next" not in links:
+                break
 
-            r = requests.get(
-                url,
-                headers=headers,
-                params=params,
-            )
+            page_urls = TredictPy._page_urls(links)
 
-            if r.status_code == 200:
-                pages.extend(
-                    r.json()["_embedded"][list(r.json()["_embedded"].keys())[0]]
+            if page_urls:
+                # The last page is known so fetch the remaining pages concurrently, only keeping MAX_WORKERS in flight
+                # so pages are not fetched far ahead of the caller
+                executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+                page_urls = iter(page_urls)
+                pending = deque(
+                    executor.submit(get_page, page_url)
+                    for page_url in islice(page_urls, MAX_WORKERS)
                 )
 
-                if (
-                    "_links" not in r.json().keys()
-                    or "next" not in r.json()["_links"].keys()
-                ):
-                    break
-                else:
-                    url = r.json()["_links"]["next"]["href"]
-                    # Also need to set params to None as next contains params
-                    params = None
+                try:
+                    while pending:
+                        _, items = pending.popleft().result()
+
+                        # Start the next page before handing this one to the caller
+                        page_url = next(page_urls, None)
+                        if page_url is not None:
+                            pending.append(executor.submit(get_page, page_url))
+
+                        yield from items
+                finally:
+                    # Do not fetch any more pages if the caller stops early or a request fails
+                    executor.shutdown(cancel_futures=True)
+                break
             else:
-                raise APIException(
-                    f"Request to {endpoint} failed error {r.status_code} ({ERROR_CODES[r.status_code]})."
-                )
+                url = links["next"]["href"]
+                # Also need to set params to None as next contains params
+                params = None
 
-        return pages
+    def iter_activity_list(
+        self, start_date: datetime | str = None, page_size: int = 500
+    ) -> Iterator[dict]:
+        """Fetch activities one page at a time.
 
-    def activity_list(self, start_date: datetime = None, page_size: int = 500) -> list:
-        """Fetch a list of activities.
+        Use instead of activity_list() to process activities as they arrive rather than holding all of them in memory.
 
         Args:
-            start_date (datetime, optional): Fetch activities starting from this date. Local times will be converted to
-            UTC. Defaults to None.
+            start_date (datetime | str, optional): Fetch activities starting from this date. Local times will be
+            converted to UTC and strings sent as given. Defaults to None.
             page_size (int, optional): Number of results per page, must be at least 50 and no more than 1000. Defaults
             to 500.
 
@@ -523,34 +976,92 @@ class TredictPy:
             APIException: If the page size requested is invalid or the request fails.
 
         Returns:
-            list: A list of dicts containing the individual activities.
+            Iterator[dict]: An iterator of dicts containing the individual activities.
         """
 
         if page_size < 50 or page_size > 1000:
             raise APIException("Page size must be at least 50 and no more than 1000.")
 
-        params = {
-            "startDate": (
-                start_date.astimezone(timezone.utc).isoformat() if start_date else None
-            ),
-            "pageSize": page_size,
-        }
+        params = TredictPy._without_none(
+            {
+                "startDate": TredictPy._iso_utc(start_date),
+                "pageSize": page_size,
+            }
+        )
+
+        return self._iter_list_endpoint("activityList", params)
+
+    def activity_list(
+        self, start_date: datetime | str = None, page_size: int = 500
+    ) -> list:
+        """Fetch a list of activities.
+
+        Args:
+            start_date (datetime | str, optional): Fetch activities starting from this date. Local times will be
+            converted to UTC and strings sent as given. Defaults to None.
+            page_size (int, optional): Number of results per page, must be at least 50 and no more than 1000. Defaults
+            to 500.
+
+        Raises:
+            APIException: If the page size requested is invalid or the request fails.
+
+        Returns:
+            list: A list of dicts containing the individual activities.
+        """
+        return list(self.iter_activity_list(start_date, page_size))
+
+    def iter_planned_training_list(
+        self,
+        start_date: datetime | str = None,
+        end_date: datetime | str = None,
+        sport_type: str = None,
+    ) -> Iterator[dict]:
+        """Fetch planned training one page at a time.
+
+        Use instead of planned_training_list() to process planned training as it arrives rather than holding all of it
+        in memory.
+
+        Args:
+            start_date (datetime | str, optional): Fetch planned training starting from this date. Local times will be
+            converted to UTC and strings sent as given. Defaults to None.
+            end_date (datetime | str, optional): Fetch planned training ending at this date. Local times will be
+            converted to UTC and strings sent as given. Defaults to None.
+            sport_type (str, optional): Fetch planned training for only this sport. Possible values are 'running',
+            'cycling', 'swimming', 'misc'. Default to None.
+
+        Raises:
+            APIException: If the request fails or the sport type specified is invalid.
+
+        Returns:
+            Iterator[dict]: An iterator of dicts containing the individual planned training.
+        """
 
-        return self._list_endpoint("activityList", params)
+        if sport_type is not None and sport_type not in SPORT_TYPES:
+            raise APIException(f"Invalid sport type '{sport_type}' specified!")
+
+        params = TredictPy._without_none(
+            {
+                "startDate": TredictPy._iso_utc(start_date),
+                "endDate": TredictPy._iso_utc(end_date),
+                "sportType": sport_type,
+            }
+        )
+
+        return self._iter_list_endpoint("plannedTrainingList", params)
 
     def planned_training_list(
         self,
-        start_date: datetime = None,
-        end_date: datetime = None,
+        start_date: datetime | str = None,
+        end_date: datetime | str = None,
         sport_type: str = None,
     ) -> list:
         """Fetch a list of planned training.
 
         Args:
-            start_date (datetime, optional): Fetch planned training starting from this date. Local times will be
-            converted to UTC. Defaults to None.
-            end_date (datetime, optional): Fetch planned training ending at this date. Local times will be converted to
-            UTC. Defaults to None.
+            start_date (datetime | str, optional): Fetch planned training starting from this date. Local times will be
+            converted to UTC and strings sent as given. Defaults to None.
+            end_date (datetime | str, optional): Fetch planned training ending at this date. Local times will be
+            converted to UTC and strings sent as given. Defaults to None.
             sport_type (str, optional): Fetch planned training for only this sport. Possible values are 'running',
             'cycling', 'swimming', 'misc'. Default to None.
 
@@ -560,21 +1071,7 @@ class TredictPy:
         Returns:
             list: A list of dicts containing the individual activities.
         """
-
-        if sport_type not in ["running", "cycling", "swimming", "misc"]:
-            APIException(f"Invalid sport type '{sport_type}' specified!")
-
-        params = {
-            "startDate": (
-                start_date.astimezone(timezone.utc).isoformat() if start_date else None
-            ),
-            "endDate": (
-                end_date.astimezone(timezone.utc).isoformat() if end_date else None
-            ),
-            "sportType": sport_type,
-        }
-
-        return self._list_endpoint("plannedTrainingList", params)
+        return list(self.iter_planned_training_list(start_date, end_date, sport_type))
 
     def _download_endpoint(
         self, endpoint: str, id: str = None, params: dict = None
@@ -593,44 +1090,14 @@ class TredictPy:
             dict: A dict containing the response.
         """
 
-        if (
-            not self._config["personal_access_token"]
-            and not self.is_user_access_token_valid()
-        ):
-            raise APIException(
-                "No personal access token and user access token not obtained or expired."
-            )
-
-        bearer_token = (
-            self._config["personal_access_token"]
-            or self._config["user_access_token"]["access_token"]
-        )
-
-        headers = {
-            "authorization": f"bearer {bearer_token}",
-            "accept": "application/json;charset=UTF-8",
-        }
+        self._ensure_valid_token()
 
-        url = (
-            ENDPOINT_BASE_URL
-            + endpoint
-            + ("/" + self._endpoint_append if self._endpoint_append else "")
-        )
+        url = self._endpoint_urls[endpoint]
         url = f"{url}/{id}" if id else url  # Append the ID if there is one
 
-        r = requests.get(
-            url,
-            headers=headers,
-            params=params,
-        )
+        r = self._get(url, f"Request to {endpoint}", params)
 
-        if r.status_code == 200:
-            return r.json()
-
-        else:
-            raise APIException(
-                f"Request to {endpoint} failed error {r.status_code} ({ERROR_CODES[r.status_code]})."
-            )
+        return TredictPy._json_loads(r.content)
 
     def activity_download(self, id: str) -> dict:
         """Download an activity as JSON.
@@ -646,6 +1113,25 @@ class TredictPy:
         """
         return self._download_endpoint("activity", id=id)
 
+    def activity_download_many(self, ids: list) -> list:
+        """Download several activities concurrently as JSON.
+
+        Args:
+            ids (list): IDs of the activities. If unknown these can be found with activity_list().
+
+        Raises:
+            APIException: If any of the requests fail.
+
+        Returns:
+            list: A list of dicts containing the activities in the same order as ids.
+        """
+
+        # Check before the downloads start so they do not all try to refresh the token
+        self._ensure_valid_token()
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            return list(executor.map(self.activity_download, ids))
+
     def bodyvalues_download(self) -> dict:
         """Download body values as JSON.
 
@@ -671,12 +1157,14 @@ class TredictPy:
             dict: A dict containing the capacity values.
         """
 
-        if sport_type not in ["running", "cycling", "swimming", "misc"]:
-            APIException(f"Invalid sport type '{sport_type}' specified!")
+        if sport_type is not None and sport_type not in SPORT_TYPES:
+            raise APIException(f"Invalid sport type '{sport_type}' specified!")
 
-        params = {
-            "sportType": sport_type,
-        }
+        params = TredictPy._without_none(
+            {
+                "sportType": sport_type,
+            }
+        )
 
         return self._download_endpoint("capacity", params=params)
 
@@ -694,27 +1182,29 @@ class TredictPy:
             dict: A dict containing the zones.
         """
 
-        if sport_type not in ["running", "cycling", "swimming", "misc"]:
-            APIException(f"Invalid sport type '{sport_type}' specified!")
+        if sport_type is not None and sport_type not in SPORT_TYPES:
+            raise APIException(f"Invalid sport type '{sport_type}' specified!")
 
-        params = {
-            "sportType": sport_type,
-        }
+        params = TredictPy._without_none(
+            {
+                "sportType": sport_type,
+            }
+        )
 
         return self._download_endpoint("zones", params=params)
 
     def efforts_download(
         self,
-        start_date: datetime = None,
-        end_date: datetime = None,
+        start_date: datetime | str = None,
+        end_date: datetime | str = None,
     ) -> dict:
         """Fetch efforts.
 
         Args:
-            start_date (datetime, optional): Fetch efforts from this date. Local times will be converted to UTC.
-            Defaults to None.
-            end_date (datetime, optional): Fetch efforts ending at this date. Local times will be converted to UTC.
-            Defaults to None.
+            start_date (datetime | str, optional): Fetch efforts from this date. Local times will be converted to UTC
+            and strings sent as given. Defaults to None.
+            end_date (datetime | str, optional): Fetch efforts ending at this date. Local times will be converted to UTC
+            and strings sent as given. Defaults to None.
 
         Raises:
             APIException: If the request fails.
@@ -723,29 +1213,27 @@ class TredictPy:
             dict: A dict containing the efforts.
         """
 
-        params = {
-            "startDate": (
-                start_date.astimezone(timezone.utc).isoformat() if start_date else None
-            ),
-            "endDate": (
-                end_date.astimezone(timezone.utc).isoformat() if end_date else None
-            ),
-        }
+        params = TredictPy._without_none(
+            {
+                "startDate": TredictPy._iso_utc(start_date),
+                "endDate": TredictPy._iso_utc(end_date),
+            }
+        )
 
         return self._download_endpoint("efforts", params=params)
 
     def hrv_download(
         self,
-        start_date: datetime = None,
-        end_date: datetime = None,
+        start_date: datetime | str = None,
+        end_date: datetime | str = None,
     ) -> dict:
         """Fetch HRV data
 
         Args:
-            start_date (datetime, optional): Fetch HRV data from this date. Local times will be converted to UTC.
-            Defaults to None.
-            end_date (datetime, optional): Fetch HRV data ending at this date. Local times will be converted to UTC.
-            Defaults to None.
+            start_date (datetime | str, optional): Fetch HRV data from this date. Local times will be converted to
+            UTC and strings sent as given. Defaults to None.
+            end_date (datetime | str, optional): Fetch HRV data ending at this date. Local times will be converted to
+            UTC and strings sent as given. Defaults to None.
 
         Raises:
             APIException: If the request fails.
@@ -754,20 +1242,23 @@ class TredictPy:
             dict: A dict containing the HRV data.
         """
 
-        params = {
-            "startDate": (
-                start_date.astimezone(timezone.utc).isoformat() if start_date else None
-            ),
-            "endDate": (
-                end_date.astimezone(timezone.utc).isoformat() if end_date else None
-            ),
-        }
+        params = TredictPy._without_none(
+            {
+                "startDate": TredictPy._iso_utc(start_date),
+                "endDate": TredictPy._iso_utc(end_date),
+            }
+        )
 
         return self._download_endpoint("hrv", params=params)
 
     def _file_download_endpoint(
-        self, endpoint: str, id: str, params: dict = None, file_type: str = None
-    ) -> bytes:
+        self,
+        endpoint: str,
+        id: str,
+        params: dict = None,
+        file_type: str = None,
+        file_path: str = None,
+    ) -> bytes | None:
         """Make a request to a file download endpoint.
 
         Args:
@@ -776,60 +1267,40 @@ class TredictPy:
             params (dict, optional): Parameters if required for the request. Defaults to None.
             file_type (str, optional): Type of file to download, either 'json' or 'fit'. Only applicable to planned
             training. Defaults to None.
+            file_path (str, optional): Path to stream the file to instead of returning it. Defaults to None.
 
         Raises:
             APIException: If the request fails or the file type is invalid
 
         Returns:
-            bytes: Binary content of the response which could be JSON or a FIT file.
+            bytes | None: Binary content of the response which could be JSON or a FIT file or None if it was written
+            to file_path.
         """
 
-        if (
-            not self._config["personal_access_token"]
-            and not self.is_user_access_token_valid()
-        ):
+        if file_type and (file_type not in FILE_TYPES or endpoint == "activity"):
             raise APIException(
-                "No personal access token and user access token not obtained or expired."
-            )
-
-        if file_type and (file_type not in ["json", "fit"] or endpoint == "activity"):
-            APIException(
                 f"Invalid file type '{file_type}' specified or file type not applicable!"
             )
 
-        bearer_token = (
-            self._config["personal_access_token"]
-            or self._config["user_access_token"]["access_token"]
-        )
-
-        headers = {
-            "authorization": f"bearer {bearer_token}",
-            "accept": "application/json;charset=UTF-8",
-        }
+        self._ensure_valid_token()
 
-        url = (
-            ENDPOINT_BASE_URL
-            + endpoint
-            + "/file"
-            + ("/" + self._endpoint_append if self._endpoint_append else "")
-        )
+        url = self._endpoint_urls[f"{endpoint}/file"]
         url = (
             f"{url}/{file_type}" if file_type else url
         )  # Append the type if there is one
         url = f"{url}/{id}"
 
-        r = requests.get(
-            url,
-            headers=headers,
-            params=params,
+        r = self._get(
+            url, f"Request to {endpoint}", params, stream=file_path is not None
         )
 
-        if r.status_code == 200:
-            return r.content
+        if file_path:
+            # Write the file as it arrives rather than holding all of it in memory
+            with r, open(file_path, "wb") as f:
+                for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
         else:
-            raise APIException(
-                f"Request to {endpoint} failed error {r.status_code} ({ERROR_CODES[r.status_code]})."
-            )
+            return r.content
 
     def planned_training_download(
         self, id: str, language: str = "en", extra_values: bool = False
@@ -851,45 +1322,51 @@ class TredictPy:
             dict: A dict containing the planned training.
         """
 
-        if language not in ["en", "de"]:
-            APIException(f"Invalid language '{language}' specified!")
+        if language not in LANGUAGES:
+            raise APIException(f"Invalid language '{language}' specified!")
 
         params = {"language": language, "extraValues": 1 if extra_values else 0}
 
         # This one is actually a file endpoint but returns JSON.
-        return json.loads(
+        return TredictPy._json_loads(
             self._file_download_endpoint(
                 "plannedTraining", params=params, id=id, file_type="json"
             )
         )
 
-    def planned_training_file_download(self, id: str) -> bytes:
+    def planned_training_file_download(
+        self, id: str, file_path: str = None
+    ) -> bytes | None:
         """Download planned training as a FIT file.
 
         Params:
             id (str): ID of the planned training. If unknown this can be found with planned_training_list().
+            file_path (str, optional): Path to save the fit file to instead of returning it. Defaults to None.
 
         Raises:
             APIException: If the request fails.
 
         Returns:
-            bytes: The fit file.
+            bytes | None: The fit file or None if it was saved to file_path.
         """
-        return self._file_download_endpoint("plannedTraining", id=id, file_type="fit")
+        return self._file_download_endpoint(
+            "plannedTraining", id=id, file_type="fit", file_path=file_path
+        )
 
-    def activity_file_download(self, id: str) -> bytes:
+    def activity_file_download(self, id: str, file_path: str = None) -> bytes | None:
         """Download an activity as a FIT file.
 
         Params:
             id (str): ID of the activity. If unknown this can be found with activity_list().
+            file_path (str, optional): Path to save the fit file to instead of returning it. Defaults to None.
 
         Raises:
             APIException: If the request fails.
 
         Returns:
-            bytes: The fit file.
+            bytes | None: The fit file or None if it was saved to file_path.
         """
-        return self._file_download_endpoint("activity", id=id)
+        return self._file_download_endpoint("activity", id=id, file_path=file_path)
 
     def activity_upload(
         self, file_path: str, activity_name: str = None, activity_notes: str = None
@@ -909,68 +1386,61 @@ class TredictPy:
             the failure is due to a duplicate).
         """
 
-        if (
-            not self._config["personal_access_token"]
-            and not self.is_user_access_token_valid()
-        ):
-            raise APIException(
-                "No personal access token and user access token not obtained or expired."
-            )
+        self._ensure_valid_token()
+
+        url = self._endpoint_urls["activity/upload"]
 
         with open(file_path, "rb") as f:
             activity_file = f.read(12)
 
-        if activity_file[8:12].decode() == ".FIT":
-            file_type = ".fit"
-        elif activity_file[0:5] == "<?xml":
-            file_type = ".tcx"  # Probably - it is at least XML
-        else:
-            APIException(
-                f"Unable to upload file as it is not a FIT or TCX activity file!"
+            # FIT files have .FIT at bytes 8 to 12, TCX files are XML (probably - it is at least XML)
+            if activity_file[8:12] != b".FIT" and activity_file[0:5] != b"<?xml":
+                raise APIException(
+                    "Unable to upload file as it is not a FIT or TCX activity file!"
+                )
+
+            f.seek(0)
+
+            # Stream the file from disk as the request is sent rather than building the body in memory
+            body = _MultipartBody(
+                ("file", os.path.basename(file_path), f),
+                {"name": activity_name, "notes": activity_notes},
+            )
+
+            r = self._session.post(
+                url,
+                headers={"content-type": body.content_type},
+                data=body,
+                timeout=TIMEOUT,
             )
 
-        bearer_token = (
-            self._config["personal_access_token"]
-            or self._config["user_access_token"]["access_token"]
+        # Handle the error codes correctly
+        return TredictPy._json_loads(
+            TredictPy._check_response("Activity file upload", r).content
         )
 
-        headers = {
-            "authorization": f"bearer {bearer_token}",
-            "accept": "application/json;charset=UTF-8",
-        }
+    def activity_upload_many(self, file_paths: list) -> list:
+        """Upload several activities concurrently as either FIT or TCX activity files (FIT is preferred).
 
-        url = (
-            ENDPOINT_BASE_URL
-            + "activity/upload"
-            + ("/" + self._endpoint_append if self._endpoint_append else "")
-        )
+        Args:
+            file_paths (list): Paths to the activity files.
 
-        files = {
-            "file": (
-                file_path.split("/")[-1],
-                open(file_path, "rb"),
-            ),
-            "name": (None, activity_name),
-            "notes": (None, activity_notes),
-        }
+        Raises:
+            APIException: If any of the requests fail or an activity file is not of the correct type.
 
-        # r = requests.Request("POST", url, headers=headers, files=files)
-        # print(r.prepare().body.decode("unicode_escape"))
-        # return
+        Returns:
+            list: A list of the responses from activity_upload() in the same order as file_paths.
+        """
 
-        r = requests.post(url, headers=headers, files=files)
+        # Check before the uploads start so they do not all try to refresh the token
+        self._ensure_valid_token()
 
-        if r.status_code == 200:
-            return r.json()
-        else:
-            # Handle the error codes correctly
-            raise APIException(
-                f"Activity file upload failed error {r.status_code} ({ERROR_CODES[r.status_code]})."
-            )
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            return list(executor.map(self.activity_upload, file_paths))
 
     def bodyvalues_upload(
         self,
-        values_date: datetime = datetime.now(timezone.utc),
+        values_date: datetime = None,
         resting_heart_rate: int = None,
         weight: float = None,
         height: int = None,
@@ -981,11 +1451,11 @@ class TredictPy:
         """Upload body values.
 
         Args:
-            values_date (datetime, optional): Timestamp for the upload including timezone if applicable. Defaults to now
-            in UTC.
+            values_date (datetime, optional): Timestamp for the upload including timezone if applicable. Naive times are
+            taken as local time. Defaults to now in UTC.
             resting_heart_rate (int, optional): Value for resting heart rate (bpm). Defaults to None.
             weight (float, optional): Weight in kilograms. Defaults to None.
-            height (fl0at, optional): height in centimetres. Defaults to None.
+            height (int, optional): height in centimetres. Defaults to None.
             body_fat_percent (float, optional): Body fat percentage. Defaults to None.
             body_water_percent (float, optional): Body water percentage. Defaults to None.
             body_muscle_percent (float, optional): Body muscle mass percentage. Defaults to None.
@@ -994,58 +1464,91 @@ class TredictPy:
             APIException: If the request fails.
         """
 
-        if (
-            not self._config["personal_access_token"]
-            and not self.is_user_access_token_valid()
-        ):
-            raise APIException(
-                "No personal access token and user access token not obtained or expired."
-            )
-
-        bearer_token = (
-            self._config["personal_access_token"]
-            or self._config["user_access_token"]["access_token"]
+        self.bodyvalues_upload_batch(
+            [
+                {
+                    "values_date": values_date,
+                    "resting_heart_rate": resting_heart_rate,
+                    "weight": weight,
+                    "height": height,
+                    "body_fat_percent": body_fat_percent,
+                    "body_water_percent": body_water_percent,
+                    "body_muscle_percent": body_muscle_percent,
+                }
+            ]
         )
 
-        headers = {
-            "authorization": f"bearer {bearer_token}",
-            "accept": "application/json;charset=UTF-8",
-            "content-type": "application/json;charset=UTF-8",
-        }
+    def bodyvalues_upload_batch(self, samples: list) -> None:
+        """Upload several sets of body values in one request.
 
-        url = (
-            ENDPOINT_BASE_URL
-            + "bodyvalues"
-            + ("/" + self._endpoint_append if self._endpoint_append else "")
-        )
+        Args:
+            samples (list): A list of dicts each with the same keys as the arguments of bodyvalues_upload(). Missing
+            keys default to the same as bodyvalues_upload().
+
+        Raises:
+            APIException: If the request fails.
+        """
+
+        self._ensure_valid_token()
+
+        url = self._endpoint_urls["bodyvalues"]
 
         data = {
-            "bodyvalues": [
-                {
-                    "timestamp": (values_date.astimezone(timezone.utc).isoformat()),
-                    "timezoneOffsetInSeconds": int(
-                        values_date.utcoffset().total_seconds()
-                    ),
-                    "restingHeartrate": resting_heart_rate,
-                    "weightInKilograms": weight,
-                    "bodyHeightInCentimeter": height,
-                    "bodyFatInPercent": body_fat_percent,
-                    "bodyWaterInPercent": body_water_percent,
-                    "muscleMassInPercent": body_muscle_percent,
-                }
-            ],
+            "bodyvalues": [TredictPy._bodyvalues(**sample) for sample in samples],
         }
 
-        # Delete the values not supplied
-        for k, v in list(data["bodyvalues"][0].items()):
-            if v is None:
-                del data["bodyvalues"][0][k]
+        # Upload was successful if it does not raise but nothing is returned
+        TredictPy._check_response(
+            "Body values upload",
+            self._session.post(
+                url,
+                headers=JSON_HEADERS,
+                data=TredictPy._json_dumps(data),
+                timeout=TIMEOUT,
+            ),
+        )
 
-        r = requests.post(url, headers=headers, json=data)
+    @staticmethod
+    def _bodyvalues(
+        values_date: datetime = None,
+        resting_heart_rate: int = None,
+        weight: float = None,
+        height: int = None,
+        body_fat_percent: float = None,
+        body_water_percent: float = None,
+        body_muscle_percent: float = None,
+    ) -> dict:
+        """Create the API representation of a set of body values.
 
-        if r.status_code == 200:
-            return  # Upload was successful but nothing is returned
-        else:
-            raise APIException(
-                f"Body values upload failed error {r.status_code} ({ERROR_CODES[r.status_code]})."
-            )
+        Args:
+            values_date (datetime, optional): Timestamp for the values including timezone if applicable. Naive times are
+            taken as local time. Defaults to now in UTC.
+            resting_heart_rate (int, optional): Value for resting heart rate (bpm). Defaults to None.
+            weight (float, optional): Weight in kilograms. Defaults to None.
+            height (int, optional): height in centimetres. Defaults to None.
+            body_fat_percent (float, optional): Body fat percentage. Defaults to None.
+            body_water_percent (float, optional): Body water percentage. Defaults to None.
+            body_muscle_percent (float, optional): Body muscle mass percentage. Defaults to None.
+
+        Returns:
+            dict: The body values without the values not supplied.
+        """
+
+        if values_date is None:
+            values_date = datetime.now(timezone.utc)
+        elif values_date.utcoffset() is None:
+            # Naive datetimes are local time and need the local offset
+            values_date = values_date.astimezone()
+
+        return TredictPy._without_none(
+            {
+                "timestamp": TredictPy._iso_utc(values_date),
+                "timezoneOffsetInSeconds": int(values_date.utcoffset().total_seconds()),
+                "restingHeartrate": resting_heart_rate,
+                "weightInKilograms": weight,
+                "bodyHeightInCentimeter": height,
+                "bodyFatInPercent": body_fat_percent,
+                "bodyWaterInPercent": body_water_percent,
+                "muscleMassInPercent": body_muscle_percent,
+            }
+        )